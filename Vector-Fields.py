@@ -1,10 +1,16 @@
+import os
 import sys
+import threading
+import functools
+from collections import OrderedDict
 import numpy as np
 import sympy as sp
+from sympy.parsing.sympy_parser import parse_expr, standard_transformations, convert_xor, \
+    implicit_multiplication_application
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, \
-    QComboBox, QLineEdit, QRadioButton, QButtonGroup, QFileDialog, QFormLayout
+    QComboBox, QLineEdit, QRadioButton, QButtonGroup, QFileDialog, QFormLayout, QSpinBox, QMessageBox
 from PyQt5.QtGui import QPalette, QColor
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
@@ -12,20 +18,200 @@ from mpl_toolkits.mplot3d import Axes3D
 import matplotlib.pyplot as plt
 from PyQt5.QtGui import QIcon
 
-epsilon = 1e-5
+try:
+    import symengine as se
+except ImportError:
+    se = None
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+try:
+    import numba
+except ImportError:
+    numba = None
+
+min_norm = np.float32(1e-2)
+
+SYMBOLS = {
+    "Cartesian": sp.symbols('x y z'),
+    "Cylindrical": sp.symbols('r theta z'),
+    "Spherical": sp.symbols('r theta phi'),
+}
+# Same input as sympify (x^2 is a power) plus implicit multiplication such as "2x" or "r sin(theta)"
+TRANSFORMATIONS = standard_transformations + (convert_xor, implicit_multiplication_application)
+
+# The dark theme is applied once to the whole application and styles widgets by type
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'style.qss')) as style_file:
+    STYLE_SHEET = style_file.read()
+
+PLOT_TYPES = {
+    "Cartesian": ["3D", "XY", "YZ", "XZ"],
+    "Cylindrical": ["3D", "Rθ", "RZ", "θZ"],
+    "Spherical": ["3D", "Rθ", "Rφ", "θφ"],
+}
+LABELS = {
+    "Cartesian": ["Vx:", "Vy:", "Vz:"],
+    "Cylindrical": ["Vr:", "Vθ:", "Vz:"],
+    "Spherical": ["Vr:", "Vθ:", "Vφ:"],
+}
+PLACEHOLDERS = {
+    "Cartesian": ["y", "-x", "z"],
+    "Cylindrical": ["-r*sin(theta)", "r*cos(theta)", "z"],
+    "Spherical": ["r*sin(theta)*cos(phi)", "r*sin(theta)*sin(phi)", "r*cos(theta)"],
+}
+
+
+def safe_normalize(U, V):
+    # Clamp tiny vectors so they stay short instead of dividing by zero
+    norm = np.hypot(U, V)
+    if ne is not None:
+        # numexpr evaluates the whole expression in cache-sized blocks instead of one temporary per operation
+        components = {'U': U, 'V': V, 'norm': norm, 'min_norm': min_norm}
+        return (ne.evaluate("U / where(norm < min_norm, min_norm, norm)", local_dict=components),
+                ne.evaluate("V / where(norm < min_norm, min_norm, norm)", local_dict=components))
+    np.maximum(norm, min_norm, out=norm)
+    return U / norm, V / norm
+
+
+@functools.lru_cache(maxsize=128)
+def parse_field(coord_system, vector_field):
+    # Re-plotting a field, or switching its plot type, reuses the parsed expressions
+    local_dict = {str(symbol): symbol for symbol in SYMBOLS[coord_system]}
+    return tuple(parse_expr(component, local_dict=local_dict, transformations=TRANSFORMATIONS)
+                 for component in vector_field)
+
+
+@functools.lru_cache(maxsize=128)
+def cartesian_components(coord_system, field):
+    # Positions and field vectors in Cartesian components, so one kernel with shared subexpressions yields
+    # X, Y, Z, U, V and W together
+    if coord_system == "Cylindrical":
+        r, theta, z = SYMBOLS[coord_system]
+        position = (r * sp.cos(theta), r * sp.sin(theta), z)
+        basis = sp.Matrix([[sp.cos(theta), -sp.sin(theta), 0],
+                           [sp.sin(theta), sp.cos(theta), 0],
+                           [0, 0, 1]])
+    else:  # Spherical
+        r, theta, phi = SYMBOLS[coord_system]
+        position = (r * sp.sin(theta) * sp.cos(phi), r * sp.sin(theta) * sp.sin(phi), r * sp.cos(theta))
+        basis = sp.Matrix([[sp.sin(theta) * sp.cos(phi), sp.cos(theta) * sp.cos(phi), -sp.sin(phi)],
+                           [sp.sin(theta) * sp.sin(phi), sp.cos(theta) * sp.sin(phi), sp.cos(phi)],
+                           [sp.cos(theta), -sp.sin(theta), 0]])
+    # Columns are the local unit vectors in Cartesian components, so the product is the field in x, y, z
+    return position + tuple(basis * sp.Matrix(field))
+
+
+def unit_vectors(U, V, W):
+    # One reciprocal square root pass, written in place, instead of quiver normalizing arrow by arrow
+    norm = U * U
+    norm += V * V
+    norm += W * W
+    np.sqrt(norm, out=norm)
+    np.putmask(norm, norm == 0, 1)
+    np.reciprocal(norm, out=norm)
+    return U * norm, V * norm, W * norm
+
+
+def lambdify(variables, exprs):
+    # Compile all components together so common subexpressions are shared
+    evaluator = None
+    if se is not None:
+        # SymEngine evaluates the whole expression per point without NumPy temporaries
+        try:
+            evaluator = se.Lambdify(variables, [se.sympify(expr) for expr in exprs], real=True, cse=True)
+        except Exception:
+            # Functions SymEngine can't translate (e.g. Heaviside) still work through SymPy
+            evaluator = None
+
+    if evaluator is None:
+        fn = sp.lambdify(variables, list(exprs), modules='numpy', cse=True)
+    else:
+        def fn(*args):
+            args = np.broadcast_arrays(*args)
+            out = evaluator(np.stack(args, axis=-1)).reshape(args[0].shape + (len(exprs),))
+            return np.moveaxis(out, -1, 0)
+
+    def evaluate(*args):
+        # Constant components come back as Python scalars and backends may promote to float64
+        return [np.asarray(out, dtype=np.float32) for out in fn(*args)]
+
+    return evaluate
+
+
+def compile_field(variables, exprs, fallback):
+    # Scalar 'math' lambdas let Numba build a ufunc for each component; the grids are too small for
+    # thread-parallel launches to pay off, and the 'cpu' target starts no threading layer on the worker thread
+    # float32 first so the float32 grids don't get upcast on the way in
+    signatures = ['{0}({1})'.format(dtype, ', '.join([dtype] * len(variables))) for dtype in ('float32', 'float64')]
+    ufuncs = [numba.vectorize(signatures, target='cpu')(sp.lambdify(variables, expr, modules='math'))
+              for expr in exprs]
+
+    def evaluate(*args):
+        try:
+            return [np.asarray(ufunc(*args), dtype=np.float32) for ufunc in ufuncs]
+        except ArithmeticError:
+            # Numba raises on division by zero where NumPy returns inf, e.g. 1/r**2 at r=0
+            return fallback(*args)
+
+    # Only hand back a version that agrees with the lambdified one, including at the grids' zeros
+    probe = [np.array([0, 0.5, 1, np.pi], dtype=np.float32)] * len(variables)
+    for compiled, expected in zip(evaluate(*probe), fallback(*probe)):
+        if not np.allclose(compiled, expected, equal_nan=True):
+            raise ValueError("compiled field doesn't match the lambdified one")
+
+    return evaluate
+
+
+class CompileSignals(QObject):
+    compiled = pyqtSignal(object, object)
+
+
+class CompileTask(QRunnable):
+    def __init__(self, key, fallback):
+        super().__init__()
+        self.key = key
+        self.fallback = fallback
+        self.signals = CompileSignals()
+
+    def run(self):
+        try:
+            evaluate = compile_field(*self.key, self.fallback)
+        except Exception:
+            # The expression can't be compiled here; keep using the lambdified version
+            return
+        self.signals.compiled.emit(self.key, evaluate)
+
+
+class FieldSignals(QObject):
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object)
+
 
+class FieldPrepTask(QRunnable):
+    def __init__(self, compute, key):
+        super().__init__()
+        self.compute = compute
+        self.key = key
+        self.signals = FieldSignals()
+
+    def run(self):
+        try:
+            field = self.compute(*self.key)
+        except Exception as error:
+            # Hand the error back to the GUI thread, which re-enables plotting
+            self.signals.failed.emit(error)
+            return
+        self.signals.finished.emit(self.key, field)
+
+
+class WarmupTask(QRunnable):
+    def __init__(self, warmup):
+        super().__init__()
+        self.warmup = warmup
 
-def safe_normalize(U, V, W=None):
-    if W is None:  # 2D case
-        norm = np.sqrt(U ** 2 + V ** 2)
-        # Add a small epsilon to avoid division by zero
-        norm = np.where(norm < 1e-2, 1e-2, norm)
-        return U / norm, V / norm
-    else:  # 3D case
-        norm = np.sqrt(U ** 2 + V ** 2 + W ** 2) + epsilon
-        # Add a small epsilon to avoid division by zero
-        norm = np.where(norm < 1e-2, 1e-2, norm)
-        return U / norm, V / norm, W / norm
+    def run(self):
+        self.warmup()
 
 
 class VectorFieldVisualizer(QMainWindow):
@@ -54,7 +240,12 @@ class VectorFieldVisualizer(QMainWindow):
         self.coord_combo.addItems(["Cartesian", "Cylindrical", "Spherical"])
         self.coord_combo.setStyleSheet(
             "font-size: 20px; padding: 5px 15px 5px 15px; margin-bottom: 12px; border-radius: 18px; outline: none;")
-        self.coord_combo.currentIndexChanged.connect(self.update_input_fields)
+        # Coalesce rapid selection changes into a single update
+        self._update_timer = QTimer()
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(0)
+        self._update_timer.timeout.connect(self.update_input_fields)
+        self.coord_combo.currentIndexChanged.connect(lambda: self._update_timer.start())
 
         # Vector field input
         vector_label = QLabel("Vector Field:")
@@ -68,6 +259,19 @@ class VectorFieldVisualizer(QMainWindow):
         self.entry1.setStyleSheet("font-size: 20px; padding: 5px 15px 5px 15px; border-radius: 18px;")
         self.entry2.setStyleSheet("font-size: 20px; padding: 5px 15px 5px 15px; border-radius: 18px;")
         self.entry3.setStyleSheet("font-size: 20px; padding: 5px 15px 5px 15px; border-radius: 18px;")
+        self.entry_labels = [QLabel(), QLabel(), QLabel()]
+        self.vector_layout.addRow(self.entry_labels[0], self.entry1)
+        self.vector_layout.addRow(self.entry_labels[1], self.entry2)
+        self.vector_layout.addRow(self.entry_labels[2], self.entry3)
+
+        # Grid resolution input
+        resolution_label = QLabel("3D Grid Resolution:")
+        resolution_label.setStyleSheet("font-size: 20px;")
+        self.resolution_entry = QSpinBox()
+        # Past 30 points per axis the 3D quiver gets too dense to read or redraw smoothly
+        self.resolution_entry.setRange(2, 30)
+        self.resolution_entry.setValue(8)
+        self.resolution_entry.setStyleSheet("font-size: 20px; padding: 5px 15px 5px 15px; border-radius: 18px;")
 
         # Plot type selection
         self.plot_type_group = QButtonGroup()
@@ -77,9 +281,17 @@ class VectorFieldVisualizer(QMainWindow):
         self.plot_type_layout = QVBoxLayout()
         self.plot_type_widgets.setLayout(self.plot_type_layout)
 
+        # Build every plot type button once; update_input_fields only toggles which ones are shown
+        self._plot_type_buttons = {}
+        for plot_type in dict.fromkeys(name for plot_types in PLOT_TYPES.values() for name in plot_types):
+            radio = QRadioButton(plot_type)
+            self.plot_type_group.addButton(radio)
+            self.plot_type_layout.addWidget(radio)
+            self._plot_type_buttons[plot_type] = radio
+
         # Buttons
-        plot_button = QPushButton("Plot")
-        plot_button.clicked.connect(self.plot_vector_field)
+        self.plot_button = QPushButton("Plot")
+        self.plot_button.clicked.connect(self.plot_vector_field)
         save_button = QPushButton("Save Plot")
         save_button.clicked.connect(self.save_plot)
 
@@ -96,15 +308,28 @@ class VectorFieldVisualizer(QMainWindow):
         self.edit_axis_button.clicked.connect(lambda: self.set_navigation_mode('edit_axis'))
         self.reset_button.clicked.connect(self.reset_view)
         self.current_mode = None
+        self._rotate_cid = None
+        self._lambdify_cache = OrderedDict()
+        self._lambdify_lock = threading.Lock()
+        # Expressions are compiled one at a time in the background so plotting keeps the other threads
+        self._compile_pool = QThreadPool()
+        self._compile_pool.setMaxThreadCount(1)
+        self._last_field = None
+        self._ax = None
+        self._last_quiver = None
+        self._last_view = None
+        self._quiver_kwargs = {}
 
         # Add widgets to control layout
         control_layout.addWidget(coord_label)
         control_layout.addWidget(self.coord_combo)
         control_layout.addWidget(vector_label)
         control_layout.addWidget(self.vector_entries)
+        control_layout.addWidget(resolution_label)
+        control_layout.addWidget(self.resolution_entry)
         control_layout.addWidget(self.plot_type_label)
         control_layout.addWidget(self.plot_type_widgets)
-        control_layout.addWidget(plot_button)
+        control_layout.addWidget(self.plot_button)
         control_layout.addWidget(save_button)
         control_layout.addWidget(self.move_button)
         control_layout.addWidget(self.zoom_button)
@@ -131,6 +356,8 @@ class VectorFieldVisualizer(QMainWindow):
 
         self.update_input_fields()
         self.apply_dark_theme()
+        # Warm up on the compile thread so the global pool stays free for the first plot
+        self._compile_pool.start(WarmupTask(self._warmup))
 
     def apply_dark_theme(self):
         dark_palette = QPalette()
@@ -149,147 +376,127 @@ class VectorFieldVisualizer(QMainWindow):
         dark_palette.setColor(QPalette.HighlightedText, Qt.black)
 
         self.setPalette(dark_palette)
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #353535;
-                color: white;
-                font-size: 16px;
-            }
-            QPushButton {
-                background-color: #4a4a4a;
-                border: 2px solid whitesmoke;
-                padding: 8px;
-                border-radius: 15px;
-            }
-            QPushButton:hover, QPushButton:focus {
-                background-color: whitesmoke;
-                color: #4a4a4a;
-            }
-            QLineEdit, QComboBox {
-                background-color: #2a2a2a;
-                border: 1px solid whitesmoke;
-                padding: 5px;
-                border-radius: 5px;
-            }
-        QComboBox::drop-down {
-            color: whitesmoke;
-            subcontrol-origin: padding;
-            subcontrol-position: right;
-            width: 30px;
-            border-left-width: 1px;
-            border-left-color: whitesmoke;
-            border-left-style: solid;
-        }
-
-        QComboBox::down-arrow {
-            width: 15px;
-            height: 15px;
-            border-radius: 7px;
-            margin-right: 2px;
-            color: whitesmoke;
-            background-color: whitesmoke;
-        }
-            QRadioButton {
-                spacing: 5px;
-                padding: 5px; 
-                border: solid 2px whitesmoke;
-            }
-            QRadioButton::indicator {
-                width: 15px;
-                height: 15px;
-                border-radius: 12px;
-                padding: 3px;
-                border: solid 2px whitesmoke;
-            }
-            QRadioButton::indicator:checked {
-                background-color: #4a90e2;
-                border: 2px solid whitesmoke;
-            }
-        """)
+        QApplication.instance().setStyleSheet(STYLE_SHEET)
 
     def update_input_fields(self):
         coord_system = self.coord_combo.currentText()
+        labels = LABELS[coord_system]
+        placeholders = PLACEHOLDERS[coord_system]
+
+        # Show this system's plot type buttons instead of recreating them
+        for plot_type, radio in self._plot_type_buttons.items():
+            radio.setVisible(plot_type in PLOT_TYPES[coord_system])
+        # Keep the current plot type when the new system offers it too, so exactly one shown button is checked
+        checked = self.plot_type_group.checkedButton()
+        if checked is None or checked.text() not in PLOT_TYPES[coord_system]:
+            self._plot_type_buttons[PLOT_TYPES[coord_system][0]].setChecked(True)
+
+        # Update vector field entry labels and placeholders
+        self.entry_labels[0].setText(labels[0])
+        self.entry_labels[1].setText(labels[1])
+        self.entry_labels[2].setText(labels[2])
 
-        # Clear previous plot type options
-        for i in reversed(range(self.plot_type_layout.count())):
-            self.plot_type_layout.itemAt(i).widget().setParent(None)
-
-        # Clear previous vector field entries
-        for i in reversed(range(self.vector_layout.count())):
-            self.vector_layout.itemAt(i).widget().setParent(None)
-
-        if coord_system == "Cartesian":
-            plot_types = ["3D", "XY", "YZ", "XZ"]
-            labels = ["Vx:", "Vy:", "Vz:"]
-            placeholders = ["y", "-x", "z"]
-        elif coord_system == "Cylindrical":
-            plot_types = ["3D", "Rθ", "RZ", "θZ"]
-            labels = ["Vr:", "Vθ:", "Vz:"]
-            placeholders = ["-r*sin(theta)", "r*cos(theta)", "z"]
-        else:  # Spherical
-            plot_types = ["3D", "Rθ", "Rφ", "θφ"]
-            labels = ["Vr:", "Vθ:", "Vφ:"]
-            placeholders = ["r*sin(theta)*cos(phi)", "r*sin(theta)*sin(phi)", "r*cos(theta)"]
-
-        for plot_type in plot_types:
-            radio = QRadioButton(plot_type)
-            self.plot_type_group.addButton(radio)
-            self.plot_type_layout.addWidget(radio)
-            radio.setStyleSheet("""
-                QRadioButton {
-                    spacing: 5px;
-                    padding: 5px;
-                }
-                QRadioButton::indicator {
-                    width: 15px;
-                    height: 15px;
-                    border-radius: 12px;
-                    border: 2px solid whitesmoke;
-                }
-                QRadioButton::indicator:checked {
-                    background-color: #4a90e2;
-                    border: 2px solid whitesmoke;
-                }
-            """)
-
-        self.plot_type_group.buttons()[0].setChecked(True)
-
-        # Update vector field entry placeholders
         self.entry1.setPlaceholderText(placeholders[0])
         self.entry2.setPlaceholderText(placeholders[1])
         self.entry3.setPlaceholderText(placeholders[2])
 
-        self.vector_layout.addRow(labels[0], self.entry1)
-        self.vector_layout.addRow(labels[1], self.entry2)
-        self.vector_layout.addRow(labels[2], self.entry3)
+    def _get_lam(self, variables, exprs):
+        key = (variables, tuple(exprs))
+        # Warmup and field preparation run on different threads; build each entry only once
+        with self._lambdify_lock:
+            if key in self._lambdify_cache:
+                self._lambdify_cache.move_to_end(key)
+            else:
+                self._lambdify_cache[key] = lambdify(variables, exprs)
+                # Least recently used first out, with the same bound as parse_field
+                if len(self._lambdify_cache) > 128:
+                    self._lambdify_cache.popitem(last=False)
+                if numba is not None:
+                    # Build a compiled ufunc in the background and swap it in once it's ready
+                    task = CompileTask(key, self._lambdify_cache[key])
+                    task.signals.compiled.connect(self._use_compiled)
+                    self._compile_pool.start(task)
+            return self._lambdify_cache[key]
+
+    def _warmup(self):
+        # Compile the default fields while the window starts up so the first plot hits a warm cache
+        for coord_system, placeholders in PLACEHOLDERS.items():
+            field = parse_field(coord_system, tuple(placeholders))
+            self._get_lam(SYMBOLS[coord_system], field)
+            if coord_system != "Cartesian":
+                self._get_lam(SYMBOLS[coord_system], cartesian_components(coord_system, field))
+
+    def _use_compiled(self, key, evaluate):
+        with self._lambdify_lock:
+            # Skip fields that were evicted while they compiled
+            if key in self._lambdify_cache:
+                self._lambdify_cache[key] = evaluate
 
     def plot_vector_field(self):
-        if (self.current_mode == 'move'):
-            self.toolbar.pan()
-        if (self.current_mode == 'zoom'):
-            self.toolbar.zoom()
+        self._exit_current_mode()
         self.current_mode = 'plot'
         coord_system = self.coord_combo.currentText()
         plot_type = self.plot_type_group.checkedButton().text()
-        vector_field = [self.entry1.text() or self.entry1.placeholderText(),
+        vector_field = (self.entry1.text() or self.entry1.placeholderText(),
                         self.entry2.text() or self.entry2.placeholderText(),
-                        self.entry3.text() or self.entry3.placeholderText()]
-
-        self.figure.clear()
-
-        if plot_type == "3D":
-            ax = self.figure.add_subplot(111, projection='3d')
-            is_3D = True
+                        self.entry3.text() or self.entry3.placeholderText())
+        resolution = self.resolution_entry.value()
+
+        # Re-plotting unchanged inputs reuses the evaluated arrays and only redraws
+        key = (coord_system, plot_type, vector_field, resolution)
+        if self._last_field is not None and self._last_field[0] == key:
+            self.draw_field(*self._last_field)
+            return
+
+        # Evaluate the field off the GUI thread and draw it once it's ready
+        self.plot_button.setEnabled(False)
+        task = FieldPrepTask(self.compute_field, key)
+        task.signals.finished.connect(self.draw_field)
+        task.signals.failed.connect(self._field_failed)
+        QThreadPool.globalInstance().start(task)
+
+    def _field_failed(self, error):
+        self.plot_button.setEnabled(True)
+        # Raising inside a slot would abort the application, so report the bad field instead
+        QMessageBox.warning(self, "Plot Failed", str(error))
+
+    def draw_field(self, key, field):
+        self._last_field = (key, field)
+        self.plot_button.setEnabled(True)
+        coord_system, plot_type = key[:2]
+
+        if self._last_quiver is not None and self._last_view == (coord_system, plot_type):
+            # Same coordinate system and plot type: labels and limits are already set up, only swap the arrows
+            self._last_quiver.remove()
+            self._last_quiver = self._ax.quiver(*field, **self._quiver_kwargs)
+            self.canvas.draw_idle()
+            return
+        self._last_view = (coord_system, plot_type)
+
+        is_3D = plot_type == "3D"
+        ax = self._ax
+        if ax is not None and isinstance(ax, Axes3D) == is_3D:
+            # Same projection as the last plot: keep the axes and only drop the old arrows
+            self._last_quiver.remove()
+            # The view's limits change, so forget the navigation history like figure.clear() would
+            self.toolbar.update()
         else:
-            ax = self.figure.add_subplot(111)
-            is_3D = False
+            self.figure.clear()
+            if is_3D:
+                ax = self.figure.add_subplot(111, projection='3d')
+            else:
+                ax = self.figure.add_subplot(111)
+            ax.set_autoscale_on(False)
+            self._ax = ax
 
-        if coord_system == "Cartesian":
-            self.plot_cartesian(ax, vector_field, plot_type)
+        if is_3D:
+            self.plot_3d(ax, field)
+        elif coord_system == "Cartesian":
+            self.plot_cartesian(ax, field, plot_type)
         elif coord_system == "Cylindrical":
-            self.plot_cylindrical(ax, vector_field, plot_type)
+            self.plot_cylindrical(ax, field, plot_type)
         else:  # Spherical
-            self.plot_spherical(ax, vector_field, plot_type)
+            self.plot_spherical(ax, field, plot_type)
 
         if is_3D:
             # Apply tight layout for 3D plots
@@ -299,259 +506,241 @@ class VectorFieldVisualizer(QMainWindow):
             ax.set_position([0.1, 0.1, 0.85, 0.85])  # Adjust these values as needed
             ax.grid(True)
 
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
-    def plot_cartesian(self, ax, vector_field, plot_type):
-        x, y, z = sp.symbols('x y z')
-        Fx, Fy, Fz = sp.sympify(vector_field)
-        Fx = Fx.subs({x: x + 1e-5, y: y + 1e-6, z: z + 1e-7})
-        Fy = Fy.subs({x: x + 1e-5, y: y + 1e-6, z: z + 1e-7})
-        Fz = Fz.subs({x: x + 1e-5, y: y + 1e-6, z: z + 1e-7})
+    def add_quiver(self, ax, field, **kwargs):
+        self._quiver_kwargs = kwargs
+        self._last_quiver = ax.quiver(*field, **kwargs)
 
-        title = f"Vector Field: ({Fx}, {Fy}, {Fz})"
-        if plot_type != "3D":
-            ax.set_aspect('equal', adjustable='box')
+    def compute_field(self, coord_system, plot_type, vector_field, resolution):
+        if coord_system == "Cartesian":
+            return self.cartesian_field(vector_field, plot_type, resolution)
+        elif coord_system == "Cylindrical":
+            return self.cylindrical_field(vector_field, plot_type, resolution)
+        else:  # Spherical
+            return self.spherical_field(vector_field, plot_type, resolution)
+
+    def cartesian_field(self, vector_field, plot_type, resolution):
+        x, y, z = SYMBOLS["Cartesian"]
+        Fx, Fy, Fz = parse_field("Cartesian", vector_field)
+        # Evaluate slightly off the grid to avoid division by zero at the origin
+        dx, dy, dz = np.float32(1e-5), np.float32(1e-6), np.float32(1e-7)
 
         if plot_type == "3D":
-            X, Y, Z = np.meshgrid(np.linspace(-10, 10, 8),
-                                  np.linspace(-10, 10, 8),
-                                  np.linspace(-10, 10, 8))
-
-            U = sp.lambdify((x, y, z), Fx)(X, Y, Z)
-            V = sp.lambdify((x, y, z), Fy)(X, Y, Z)
-            W = sp.lambdify((x, y, z), Fz)(X, Y, Z)
-
-            norm = np.sqrt(U ** 2 + V ** 2 + W ** 2)
-            U, V, W = safe_normalize(U, V, W)
-
-            ax.quiver(X, Y, Z, U, V, W, length=1, normalize=False, linewidth=2)
-            ax.set_xlabel('X')
-            ax.set_ylabel('Y')
-            ax.set_zlabel('Z')
-            ax.set_xlim(-10, 10)
-            ax.set_ylim(-10, 10)
-            ax.set_zlim(-10, 10)
+            X, Y, Z = np.ix_(np.linspace(-10, 10, resolution, dtype=np.float32),
+                             np.linspace(-10, 10, resolution, dtype=np.float32),
+                             np.linspace(-10, 10, resolution, dtype=np.float32))
+            U, V, W = self._get_lam((x, y, z), (Fx, Fy, Fz))(X + dx, Y + dy, Z + dz)
+            X, Y, Z, U, V, W = np.broadcast_arrays(X, Y, Z, U, V, W)
+            U, V, W = unit_vectors(U, V, W)
+            # Flat arrays let quiver skip its own broadcasting and reshaping of the grid
+            return [a.ravel() for a in (X, Y, Z, U, V, W)]
         elif plot_type == "XY":
-            X, Y = np.meshgrid(np.linspace(-10, 10, 20), np.linspace(-10, 10, 20))
-            U = sp.lambdify((x, y), Fx.subs(z, 0))(X, Y)
-            V = sp.lambdify((x, y), Fy.subs(z, 0))(X, Y)
-            norm = np.sqrt(U ** 2 + V ** 2)
+            X, Y = np.meshgrid(np.linspace(-10, 10, 20, dtype=np.float32),
+                               np.linspace(-10, 10, 20, dtype=np.float32), sparse=True)
+            U, V, _ = self._get_lam((x, y, z), (Fx, Fy, Fz))(X + dx, Y + dy, dz)
             U, V = safe_normalize(U, V)
-            ax.quiver(X, Y, U, V)
-            ax.set_xlabel('X')
-            ax.set_ylabel('Y')
-            ax.set_xlim(-10, 10)
-            ax.set_ylim(-10, 10)
-
+            return np.broadcast_arrays(X, Y, U, V)
         elif plot_type == "YZ":
-            Y, Z = np.meshgrid(np.linspace(-10, 10, 20), np.linspace(-10, 10, 20))
-            V = sp.lambdify((y, z), Fy.subs(x, 0))(Y, Z)
-            W = sp.lambdify((y, z), Fz.subs(x, 0))(Y, Z)
-            norm = np.sqrt(V ** 2 + W ** 2)
+            Y, Z = np.meshgrid(np.linspace(-10, 10, 20, dtype=np.float32),
+                               np.linspace(-10, 10, 20, dtype=np.float32), sparse=True)
+            _, V, W = self._get_lam((x, y, z), (Fx, Fy, Fz))(dx, Y + dy, Z + dz)
             V, W = safe_normalize(V, W)
-            ax.quiver(Y, Z, V, W)
-            ax.set_xlabel('Y')
-            ax.set_ylabel('Z')
-            ax.set_xlim(-10, 10)
-            ax.set_ylim(-10, 10)
-
+            return np.broadcast_arrays(Y, Z, V, W)
         elif plot_type == "XZ":
-            X, Z = np.meshgrid(np.linspace(-10, 10, 20), np.linspace(-10, 10, 20))
-            U = sp.lambdify((x, z), Fx.subs(y, 0))(X, Z)
-            W = sp.lambdify((x, z), Fz.subs(y, 0))(X, Z)
+            X, Z = np.meshgrid(np.linspace(-10, 10, 20, dtype=np.float32),
+                               np.linspace(-10, 10, 20, dtype=np.float32), sparse=True)
+            U, _, W = self._get_lam((x, y, z), (Fx, Fy, Fz))(X + dx, dy, Z + dz)
             U, W = safe_normalize(U, W)
-            ax.quiver(X, Z, U, W)
-            ax.set_xlabel('X')
-            ax.set_ylabel('Z')
-            ax.set_xlim(-10, 10)
-            ax.set_ylim(-10, 10)
+            return np.broadcast_arrays(X, Z, U, W)
 
+    def cylindrical_field(self, vector_field, plot_type, resolution):
+        r, theta, z = SYMBOLS["Cylindrical"]
+        Fr, Ftheta, Fz = parse_field("Cylindrical", vector_field)
+        # Evaluate slightly off the grid to avoid division by zero on the axis
+        dr, dz = np.float32(1e-5), np.float32(1e-6)
 
-    def plot_cylindrical(self, ax, vector_field, plot_type):
-        r, theta, z = sp.symbols('r theta z')
-        Fr, Ftheta, Fz = sp.sympify(vector_field)
-        Fr = Fr.subs({r: r + 1e-5, z: z + 1e-6})
-        Ftheta = Ftheta.subs({r: r + 1e-5, z: z + 1e-6})
-        Fz = Fz.subs({r: r + 1e-6, z: z + 1e-6})
-
-        title = f"Vector Field: ({Fr}, {Ftheta}, {Fz})"
+        if plot_type == "3D":
+            R, THETA, Z = np.ix_(np.linspace(0, 10, resolution, dtype=np.float32),
+                                 np.linspace(0, 2 * np.pi, 2 * resolution, dtype=np.float32),
+                                 np.linspace(-10, 10, resolution, dtype=np.float32))
+            fused = self._get_lam((r, theta, z), cartesian_components("Cylindrical", (Fr, Ftheta, Fz)))
+            X, Y, Z, U, V, W = np.broadcast_arrays(*fused(R + dr, THETA, Z + dz))
+            U, V, W = unit_vectors(U, V, W)
+            # Flat arrays let quiver skip its own broadcasting and reshaping of the grid
+            return [a.ravel() for a in (X, Y, Z, U, V, W)]
+        elif plot_type == "Rθ":
+            R, THETA = np.meshgrid(np.linspace(0, 10, 20, dtype=np.float32),
+                                   np.linspace(0, 2 * np.pi, 20, dtype=np.float32), sparse=True)
+            U, V, _ = self._get_lam((r, theta, z), (Fr, Ftheta, Fz))(R + dr, THETA, dz)
+            U, V = safe_normalize(U, V)
+            return np.broadcast_arrays(R, THETA, U, V)
+        elif plot_type == "RZ":
+            R, Z = np.meshgrid(np.linspace(0, 10, 20, dtype=np.float32),
+                               np.linspace(-10, 10, 20, dtype=np.float32), sparse=True)
+            U, _, W = self._get_lam((r, theta, z), (Fr, Ftheta, Fz))(R + dr, np.float32(0), Z + dz)
+            U, W = safe_normalize(U, W)
+            return np.broadcast_arrays(R, Z, U, W)
+        elif plot_type == "θZ":
+            THETA, Z = np.meshgrid(np.linspace(0, 2 * np.pi, 20, dtype=np.float32),
+                                   np.linspace(-10, 10, 20, dtype=np.float32), sparse=True)
+            _, V, W = self._get_lam((r, theta, z), (Fr, Ftheta, Fz))(np.float32(5), THETA, Z + dz)
+            V, W = safe_normalize(V, W)
+            return np.broadcast_arrays(THETA, Z, V, W)
 
-        if plot_type != "3D":
-            ax.set_aspect('equal', adjustable='box')
+    def spherical_field(self, vector_field, plot_type, resolution):
+        r, theta, phi = SYMBOLS["Spherical"]
+        Fr, Ftheta, Fphi = parse_field("Spherical", vector_field)
 
         if plot_type == "3D":
-            R, THETA, Z = np.meshgrid(np.linspace(0, 10, 8),
-                                      np.linspace(0, 2 * np.pi, 16),
-                                      np.linspace(-10, 10, 8))
-            X = R * np.cos(THETA)
-            Y = R * np.sin(THETA)
-
-            U = sp.lambdify((r, theta, z), Fr)(R, THETA, Z) * np.cos(THETA) - \
-                sp.lambdify((r, theta, z), Ftheta)(R, THETA, Z) * np.sin(THETA)
-            V = sp.lambdify((r, theta, z), Fr)(R, THETA, Z) * np.sin(THETA) + \
-                sp.lambdify((r, theta, z), Ftheta)(R, THETA, Z) * np.cos(THETA)
-            W = sp.lambdify((r, theta, z), Fz)(R, THETA, Z)
-
-            U, V, W = safe_normalize(U, V, W)
-
-            ax.quiver(X, Y, Z, U, V, W, length=1, normalize=False, linewidth=2)
-            ax.set_xlabel('X')
-            ax.set_ylabel('Y')
-            ax.set_zlabel('Z')
-            ax.set_xlim(-10, 10)
-            ax.set_ylim(-10, 10)
-            ax.set_zlim(-10, 10)
+            R, THETA, PHI = np.ix_(np.linspace(0, 10, resolution, dtype=np.float32),
+                                   np.linspace(0, np.pi, resolution, dtype=np.float32),
+                                   np.linspace(0, 2 * np.pi, 2 * resolution, dtype=np.float32))
+
+            fused = self._get_lam((r, theta, phi), cartesian_components("Spherical", (Fr, Ftheta, Fphi)))
+            X, Y, Z, U, V, W = np.broadcast_arrays(*fused(R, THETA, PHI))
+            U, V, W = unit_vectors(U, V, W)
+            # Flat arrays let quiver skip its own broadcasting and reshaping of the grid
+            return [a.ravel() for a in (X, Y, Z, U, V, W)]
         elif plot_type == "Rθ":
-            R, THETA = np.meshgrid(np.linspace(0, 10, 20), np.linspace(0, 2 * np.pi, 20))
-            U = sp.lambdify((r, theta), Fr.subs(z, 0))(R, THETA)
-            V = sp.lambdify((r, theta), Ftheta.subs(z, 0))(R, THETA)
+            R, THETA = np.meshgrid(np.linspace(0, 10, 20, dtype=np.float32),
+                                   np.linspace(0, np.pi, 20, dtype=np.float32), sparse=True)
+            U, V, _ = self._get_lam((r, theta, phi), (Fr, Ftheta, Fphi))(R, THETA, np.float32(0))
             U, V = safe_normalize(U, V)
-            ax.quiver(R, THETA, U, V, angles='xy', scale_units='xy', scale=5)
+            return np.broadcast_arrays(R, THETA, U, V)
+        elif plot_type == "Rφ":
+            R, PHI = np.meshgrid(np.linspace(0, 10, 20, dtype=np.float32),
+                                 np.linspace(0, 2 * np.pi, 20, dtype=np.float32), sparse=True)
+            U, _, W = self._get_lam((r, theta, phi), (Fr, Ftheta, Fphi))(R, np.float32(np.pi / 2), PHI)
+            U, W = safe_normalize(U, W)
+            return np.broadcast_arrays(R, PHI, U, W)
+        elif plot_type == "θφ":
+            THETA, PHI = np.meshgrid(np.linspace(0, np.pi, 20, dtype=np.float32),
+                                     np.linspace(0, 2 * np.pi, 20, dtype=np.float32), sparse=True)
+            _, V, W = self._get_lam((r, theta, phi), (Fr, Ftheta, Fphi))(np.float32(5), THETA, PHI)
+            V, W = safe_normalize(V, W)
+            return np.broadcast_arrays(THETA, PHI, V, W)
+
+    def plot_3d(self, ax, field):
+        self.add_quiver(ax, field, length=1, normalize=False, linewidth=1, arrow_length_ratio=0.3)
+        ax.set_xlabel('X')
+        ax.set_ylabel('Y')
+        ax.set_zlabel('Z')
+        ax.set_xlim(-10, 10)
+        ax.set_ylim(-10, 10)
+        ax.set_zlim(-10, 10)
+
+    def plot_cartesian(self, ax, field, plot_type):
+        ax.set_aspect('equal', adjustable='box')
+        self.add_quiver(ax, field)
+        ax.set_xlabel(plot_type[0])
+        ax.set_ylabel(plot_type[1])
+        ax.set_xlim(-10, 10)
+        ax.set_ylim(-10, 10)
+
+    def plot_cylindrical(self, ax, field, plot_type):
+        ax.set_aspect('equal', adjustable='box')
+
+        if plot_type == "Rθ":
+            self.add_quiver(ax, field, angles='xy', scale_units='xy', scale=5)
             ax.set_xlabel('R')
             ax.set_ylabel('θ')
             ax.set_xlim(0, 10)
             ax.set_ylim(0, 2 * np.pi)
         elif plot_type == "RZ":
-            R, Z = np.meshgrid(np.linspace(0, 10, 20), np.linspace(-10, 10, 20))
-            U = sp.lambdify((r, z), Fr.subs(theta, 0))(R, Z)
-            W = sp.lambdify((r, z), Fz.subs(theta, 0))(R, Z)
-            U, W = safe_normalize(U, W)
-            ax.quiver(R, Z, U, W)
+            self.add_quiver(ax, field)
             ax.set_xlabel('R')
             ax.set_ylabel('Z')
             ax.set_xlim(0, 10)
             ax.set_ylim(-10, 10)
         elif plot_type == "θZ":
-            THETA, Z = np.meshgrid(np.linspace(0, 2 * np.pi, 20), np.linspace(-10, 10, 20))
-            V = sp.lambdify((theta, z), Ftheta.subs(r, 5))(THETA, Z)
-            W = sp.lambdify((theta, z), Fz.subs(r, 5))(THETA, Z)
-            V, W = safe_normalize(V, W)
-            ax.quiver(THETA, Z, V, W)
+            self.add_quiver(ax, field)
             ax.set_xlabel('θ')
             ax.set_ylabel('Z')
             ax.set_xlim(0, 2 * np.pi)
             ax.set_ylim(-10, 10)
 
+    def plot_spherical(self, ax, field, plot_type):
+        ax.set_aspect('equal', adjustable='box')
 
-
-    def plot_spherical(self, ax, vector_field, plot_type):
-        r, theta, phi = sp.symbols('r theta phi')
-        Fr, Ftheta, Fphi = sp.sympify(vector_field)
-
-        title = f"Vector Field: ({Fr}, {Ftheta}, {Fphi})"
-
-        if plot_type != "3D":
-            ax.set_aspect('equal', adjustable='box')
-
-        if plot_type == "3D":
-            R, THETA, PHI = np.meshgrid(np.linspace(0, 10, 8),
-                                        np.linspace(0, np.pi, 8),
-                                        np.linspace(0, 2 * np.pi, 16))
-
-            X = R * np.sin(THETA) * np.cos(PHI)
-            Y = R * np.sin(THETA) * np.sin(PHI)
-            Z = R * np.cos(THETA)
-
-            U = sp.lambdify((r, theta, phi), Fr)(R, THETA, PHI) * np.sin(THETA) * np.cos(PHI) + \
-                sp.lambdify((r, theta, phi), Ftheta)(R, THETA, PHI) * np.cos(THETA) * np.cos(PHI) - \
-                sp.lambdify((r, theta, phi), Fphi)(R, THETA, PHI) * np.sin(PHI)
-            V = sp.lambdify((r, theta, phi), Fr)(R, THETA, PHI) * np.sin(THETA) * np.sin(PHI) + \
-                sp.lambdify((r, theta, phi), Ftheta)(R, THETA, PHI) * np.cos(THETA) * np.sin(PHI) + \
-                sp.lambdify((r, theta, phi), Fphi)(R, THETA, PHI) * np.cos(PHI)
-            W = sp.lambdify((r, theta, phi), Fr)(R, THETA, PHI) * np.cos(THETA) - \
-                sp.lambdify((r, theta, phi), Ftheta)(R, THETA, PHI) * np.sin(THETA)
-
-            U, V, W = safe_normalize(U, V, W)
-
-            ax.quiver(X, Y, Z, U, V, W, length=1, normalize=False, linewidth=2)
-            ax.set_xlabel('X')
-            ax.set_ylabel('Y')
-            ax.set_zlabel('Z')
-            ax.set_xlim(-10, 10)
-            ax.set_ylim(-10, 10)
-            ax.set_zlim(-10, 10)
-        elif plot_type == "Rθ":
-            R, THETA = np.meshgrid(np.linspace(0, 10, 20), np.linspace(0, np.pi, 20))
-            U = sp.lambdify((r, theta), Fr.subs(phi, 0))(R, THETA)
-            V = sp.lambdify((r, theta), Ftheta.subs(phi, 0))(R, THETA)
-            U, V = safe_normalize(U, V)
-            ax.quiver(R, THETA, U, V, angles='xy', scale_units='xy', scale=5)
+        if plot_type == "Rθ":
+            self.add_quiver(ax, field, angles='xy', scale_units='xy', scale=5)
             ax.set_xlabel('R')
             ax.set_ylabel('θ')
             ax.set_xlim(0, 10)
             ax.set_ylim(0, np.pi)
         elif plot_type == "Rφ":
-            R, PHI = np.meshgrid(np.linspace(0, 10, 20), np.linspace(0, 2 * np.pi, 20))
-            U = sp.lambdify((r, phi), Fr.subs(theta, np.pi / 2))(R, PHI)
-            W = sp.lambdify((r, phi), Fphi.subs(theta, np.pi / 2))(R, PHI)
-            U, W = safe_normalize(U, W)
-            ax.quiver(R, PHI, U, W)
+            self.add_quiver(ax, field)
             ax.set_xlabel('R')
             ax.set_ylabel('φ')
             ax.set_xlim(0, 10)
             ax.set_ylim(0, 2 * np.pi)
         elif plot_type == "θφ":
-            THETA, PHI = np.meshgrid(np.linspace(0, np.pi, 20), np.linspace(0, 2 * np.pi, 20))
-            V = sp.lambdify((theta, phi), Ftheta.subs(r, 5))(THETA, PHI)
-            W = sp.lambdify((theta, phi), Fphi.subs(r, 5))(THETA, PHI)
-            V, W = safe_normalize(V, W)
-            ax.quiver(THETA, PHI, V, W)
+            self.add_quiver(ax, field)
             ax.set_xlabel('θ')
             ax.set_ylabel('φ')
             ax.set_xlim(0, np.pi)
             ax.set_ylim(0, 2 * np.pi)
 
-       
     def save_plot(self):
-        if (self.current_mode == 'move'):
-            self.toolbar.pan()
-        if (self.current_mode == 'zoom'):
-            self.toolbar.zoom()
+        self._exit_current_mode()
         self.current_mode = 'edit_axis'
         file_path, _ = QFileDialog.getSaveFileName(self, "Save Plot", "", "PNG Files (*.png);;All Files (*)")
         if file_path:
             self.figure.savefig(file_path)
 
+    def _exit_current_mode(self):
+        # Pan and zoom are toolbar toggles, so leaving them means toggling them off again,
+        # and rotating stops listening to mouse motion
+        if self.current_mode == 'move':
+            self.toolbar.pan()
+        elif self.current_mode == 'zoom':
+            self.toolbar.zoom()
+        if self._rotate_cid is not None:
+            self.canvas.mpl_disconnect(self._rotate_cid)
+            self._rotate_cid = None
+
     def set_navigation_mode(self, mode):
-        if hasattr(self, 'toolbar'):
+        # Re-entering an active toggle mode would switch the toolbar tool back off
+        if hasattr(self, 'toolbar') and not (mode == self.current_mode and mode in ('move', 'zoom', 'rotate')):
             if mode == 'move':
+                self._exit_current_mode()
                 self.toolbar.pan()
                 self.current_mode = 'move'
             elif mode == 'zoom':
+                self._exit_current_mode()
                 self.toolbar.zoom()
                 self.current_mode = 'zoom'
             elif mode == 'rotate':
-                self.canvas.mpl_connect('motion_notify_event', self.rotate_view)
-                if (self.current_mode == 'move'):
-                    self.toolbar.pan()
-                if (self.current_mode == 'zoom'):
-                    self.toolbar.zoom()
+                self._exit_current_mode()
+                self._rotate_cid = self.canvas.mpl_connect('motion_notify_event', self.rotate_view)
                 self.current_mode = 'rotate'
             elif mode == 'edit_axis':
                 self.toolbar.edit_parameters()
-                if (self.current_mode == 'move'):
-                    self.toolbar.pan()
-                if (self.current_mode == 'zoom'):
-                    self.toolbar.zoom()
+                self._exit_current_mode()
                 self.current_mode = 'edit_axis'
 
     def rotate_view(self, event):
-        if event.button is not None and isinstance(self.figure.gca(), Axes3D):
-            ax = self.figure.gca()
+        ax = self._ax
+        if event.button is not None and isinstance(ax, Axes3D):
             ax.view_init(elev=ax.elev + (event.ydata - event.lasty),
                          azim=ax.azim + (event.xdata - event.lastx))
-            self.canvas.draw()
+            # Coalesce redraws while the mouse is moving
+            self.canvas.draw_idle()
 
     def reset_view(self):
         if hasattr(self, 'toolbar'):
-            if (self.current_mode == 'move'):
-                self.toolbar.pan()
-            if (self.current_mode == 'zoom'):
-                self.toolbar.zoom()
+            self._exit_current_mode()
             self.current_mode = 'reset_view'
             self.toolbar.home()
         self.canvas.draw()
 
+    def closeEvent(self, event):
+        # Drop queued compiles and let a running one finish while its signals still exist
+        self._compile_pool.clear()
+        self._compile_pool.waitForDone()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)